@@ -1,14 +1,33 @@
 from collections import deque, OrderedDict
+from contextlib import contextmanager
+import csv
+import gc
+import hashlib
+import json
+import marshal
+import os
+import re
+import sys
+import weakref
 from graphviz import Digraph
 
 
 class NFA:
-    def __init__(self, states, alphabet, transitions, start_state, accepting_states):
+    def __init__(
+        self,
+        states,
+        alphabet,
+        transitions,
+        start_state,
+        accepting_states,
+        epsilon_free=False,
+    ):
         self.states = states
         self.alphabet = alphabet
         self.transitions = transitions
         self.start_state = start_state
         self.accepting_states = accepting_states
+        self.epsilon_free = epsilon_free
 
 
 class DFA:
@@ -21,6 +40,9 @@ class DFA:
 
 
 def e_closure(nfa, states):
+    if nfa.epsilon_free:
+        # No ε-transitions left, the closure of a set is the set itself
+        return set(states)
     e_closure_set = set(states)
     stack = []
     for state in states:
@@ -44,30 +66,331 @@ def move(nfa, states, symbol):
     return move_set
 
 
-def display_subsets(dfa):
-    node_map = {}
-    table = []
+def epsilon_sccs(nfa):
+    # Iterative Tarjan over the ε-edges only. Components come out in reverse
+    # topological order: every component after all the ones it can reach.
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    sccs = []
+    counter = 0
+    for root in nfa.states:
+        if root in index:
+            continue
+        work = [(root, iter(nfa.transitions.get(root, {}).get("ε", ())))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            state, successors = work[-1]
+            for next_state in successors:
+                if next_state not in index:
+                    index[next_state] = lowlink[next_state] = counter
+                    counter += 1
+                    stack.append(next_state)
+                    on_stack.add(next_state)
+                    work.append(
+                        (
+                            next_state,
+                            iter(nfa.transitions.get(next_state, {}).get("ε", ())),
+                        )
+                    )
+                    break
+                if next_state in on_stack:
+                    lowlink[state] = min(lowlink[state], index[next_state])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[state])
+                if lowlink[state] == index[state]:
+                    scc = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        scc.append(member)
+                        if member == state:
+                            break
+                    sccs.append(scc)
+    return sccs
 
-    for state in sorted(dfa.states):
-        node_map[state] = str(sorted(list(state)))
 
-    header = ["State", "A", "B", "Accept"]
-    table.append(header)
+def all_e_closures(nfa):
+    # Closures are computed once per ε-SCC over the condensed DAG, all
+    # members of a component share the same closure
+    closures = {}
+    for scc in epsilon_sccs(nfa):
+        closure = set(scc)
+        for state in scc:
+            for next_state in nfa.transitions.get(state, {}).get("ε", ()):
+                if next_state not in closure:
+                    closure |= closures[next_state]
+        closure = frozenset(closure)
+        for state in scc:
+            closures[state] = closure
+    return closures
 
-    for state, transitions in dfa.transitions.items():
+
+def remove_epsilon(nfa):
+    closures = all_e_closures(nfa)
+    accepting = set(nfa.accepting_states)
+    transitions = {}
+    for state in nfa.states:
+        state_transitions = {}
+        for reachable in closures[state]:
+            for symbol, next_states in nfa.transitions.get(reachable, {}).items():
+                if symbol == "ε":
+                    continue
+                state_transitions.setdefault(symbol, set()).update(next_states)
+        if state_transitions:
+            transitions[state] = state_transitions
+    accepting_states = {
+        state for state in nfa.states if accepting.intersection(closures[state])
+    }
+    return NFA(
+        nfa.states,
+        set(nfa.alphabet) - {"ε"},
+        transitions,
+        nfa.start_state,
+        accepting_states,
+        epsilon_free=True,
+    )
+
+
+# One {'desde', '=>', 'hacia'} record of NFA.txt. Keys and symbols may use
+# either quote style and symbols may be longer than one character.
+_nfa_record = re.compile(
+    r"""\{\s*['"]desde['"]\s*:\s*(-?\d+)\s*,"""
+    r"""\s*['"]=>['"]\s*:\s*(?:'([^']*)'|"([^"]*)")\s*,"""
+    r"""\s*['"]hacia['"]\s*:\s*\[([-\d,\s]*)\]\s*\}"""
+)
+# Separator between records, and the end of one record followed by the next
+_nfa_separator = re.compile(r"[\s,]*")
+_nfa_next_record = re.compile(r"\}\s*,\s*\{")
+_nfa_int = re.compile(r"-?\d+")
+_nfa_quoted = re.compile("'([^']*)'|\"([^\"]*)\"")
+
+
+def _nfa_symbol(symbol):
+    # NFA.txt writes ε as a blank
+    return "ε" if symbol in (" ", "ε") else symbol
+
+
+def _nfa_header_items(line, pattern, path):
+    # Items of a header line, anything besides them, commas and blanks is an error
+    items = []
+    pos = 0
+    for m in pattern.finditer(line):
+        if line[pos : m.start()].strip(", \n"):
+            break
+        items.append(m)
+        pos = m.end()
+    if line[pos:].strip(", \n"):
+        raise ValueError("Malformed header line in %s: %r" % (path, line))
+    return items
+
+
+def _nfa_targets(text, path):
+    if not text.strip():
+        return ()
+    try:
+        return [int(target) for target in text.split(",")]
+    except ValueError:
+        raise ValueError("Malformed target list in %s: [%s]" % (path, text))
+
+
+@contextmanager
+def _gc_paused():
+    # Bulk loads allocate millions of small containers, none of them cyclic
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _add_nfa_transition(transitions, state, symbol, next_states):
+    transitions.setdefault(state, {}).setdefault(_nfa_symbol(symbol), set()).update(
+        next_states
+    )
+
+
+def load_nfa_txt(path, chunk_size=1 << 20):
+    # Lines: states, alphabet, start, accepting states, then the transition
+    # records. Records are read in chunks, so a single huge line is fine.
+    # Records are matched one after another and anything that is not a
+    # record or a separator raises ValueError.
+    with open(path, encoding="utf-8") as f, _gc_paused():
+        states = {
+            int(m.group()) for m in _nfa_header_items(f.readline(), _nfa_int, path)
+        }
+        alphabet = {
+            _nfa_symbol(m.group(1) if m.group(1) is not None else m.group(2))
+            for m in _nfa_header_items(f.readline(), _nfa_quoted, path)
+        } - {"ε"}
+        start_state = int(f.readline())
+        accepting_states = {
+            int(m.group()) for m in _nfa_header_items(f.readline(), _nfa_int, path)
+        }
+        transitions = {}
+        buffer = ""
+        while True:
+            chunk = f.read(chunk_size)
+            buffer += chunk
+            pos = 0
+            while True:
+                pos = _nfa_separator.match(buffer, pos).end()
+                m = _nfa_record.match(buffer, pos)
+                if m is None:
+                    break
+                state, single, double, next_states = m.groups()
+                _add_nfa_transition(
+                    transitions,
+                    int(state),
+                    single if single is not None else double,
+                    _nfa_targets(next_states, path),
+                )
+                pos = m.end()
+            # What is left is either the start of a record cut by the chunk,
+            # or a malformed record when the next one already follows it
+            buffer = buffer[pos:]
+            if not chunk:
+                break
+            if _nfa_next_record.search(buffer):
+                break
+        if buffer:
+            raise ValueError(
+                "Malformed transition record in %s: %r" % (path, buffer[:80])
+            )
+    return NFA(states, alphabet, transitions, start_state, accepting_states)
+
+
+def _nfa_is_state(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _nfa_is_state_list(value):
+    return isinstance(value, list) and all(_nfa_is_state(v) for v in value)
+
+
+def _nfa_is_symbol_list(value):
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+
+# Header fields of the JSON-lines format and the check each value must pass
+_nfa_jsonl_header = {
+    "states": _nfa_is_state_list,
+    "alphabet": _nfa_is_symbol_list,
+    "start": _nfa_is_state,
+    "accept": _nfa_is_state_list,
+}
+
+
+def load_nfa_jsonl(path):
+    # One JSON object per line: transition records use the NFA.txt keys
+    # ("desde", "=>", "hacia"), any other line holds header fields
+    # ("states", "alphabet", "start", "accept"). Like load_nfa_txt, malformed
+    # input raises ValueError naming the file and line.
+    header = {}
+    transitions = {}
+    with open(path, encoding="utf-8") as f, _gc_paused():
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            where = "%s:%d" % (path, line_number)
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError("Invalid JSON in %s: %s" % (where, e))
+            if not isinstance(record, dict):
+                raise ValueError("Expected a JSON object in %s" % where)
+            if "desde" in record:
+                if (
+                    set(record) != {"desde", "=>", "hacia"}
+                    or not _nfa_is_state(record["desde"])
+                    or not isinstance(record["=>"], str)
+                    or not _nfa_is_state_list(record["hacia"])
+                ):
+                    raise ValueError(
+                        "Malformed transition record in %s: %s" % (where, line.strip())
+                    )
+                _add_nfa_transition(
+                    transitions, record["desde"], record["=>"], record["hacia"]
+                )
+                continue
+            for key, value in record.items():
+                check = _nfa_jsonl_header.get(key)
+                if check is None or not check(value):
+                    raise ValueError(
+                        "Malformed header field %r in %s: %s"
+                        % (key, where, line.strip())
+                    )
+            header.update(record)
+    missing = [key for key in _nfa_jsonl_header if key not in header]
+    if missing:
+        raise ValueError("Missing header fields in %s: %s" % (path, ", ".join(missing)))
+    return NFA(
+        set(header["states"]),
+        {_nfa_symbol(symbol) for symbol in header["alphabet"]} - {"ε"},
+        transitions,
+        header["start"],
+        set(header["accept"]),
+    )
+
+
+def iter_subset_rows(dfa, labels="subset"):
+    # Yields the header and then one row per DFA state. Labels are computed
+    # once per state: "subset" is the sorted NFA subset as in draw_dfa1, which
+    # costs a sort and a string as long as the subset for every state, while
+    # "index" is the position of the state in dfa.states and stays cheap for
+    # large subset tables.
+    symbols = sorted(dfa.alphabet)
+    if labels == "index":
+        node_map = {state: str(i) for i, state in enumerate(dfa.states)}
+    else:
+        node_map = {state: str(sorted(state)) for state in dfa.states}
+    accepting = set(dfa.accepting_states)
+
+    yield ["State"] + symbols + ["Accept"]
+
+    for state in dfa.states:
+        transitions = dfa.transitions.get(state, {})
         row = [node_map[state]]
-        for symbol in sorted(dfa.alphabet):
+        for symbol in symbols:
             next_state = transitions.get(symbol, None)
             row.append(node_map[next_state] if next_state else "")
+        row.append("Accept" if state in accepting else "")
+        yield row
 
-        if state in dfa.accepting_states:
-            row.append("Accept")
-        else:
-            row.append("")
 
-        table.append(row)
+def export_subsets(dfa, out, fmt="csv", labels="index"):
+    # Writes the subset table to an open text file one row at a time,
+    # fmt is "csv", "tsv" or "jsonl". Rows use index labels unless
+    # labels="subset" is asked for. Returns the number of states written.
+    rows = iter_subset_rows(dfa, labels)
+    header = next(rows)
+    count = 0
+    if fmt == "jsonl":
+        for row in rows:
+            out.write(json.dumps(dict(zip(header, row)), ensure_ascii=False) + "\n")
+            count += 1
+        return count
+    if fmt not in ("csv", "tsv"):
+        raise ValueError("Unknown export format: " + fmt)
+    writer = csv.writer(out, delimiter="\t" if fmt == "tsv" else ",")
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
 
-    return table
+def display_subsets(dfa):
+    return list(iter_subset_rows(dfa))
 
 
 def print_table(table):
@@ -146,6 +469,85 @@ def nfa_to_dfa(nfa):
     return dfa
 
 
+# NFA and alphabet shared with the pool workers, sent once per process by
+# the initializer instead of with every job
+_pool_nfa = None
+_pool_symbols = None
+
+
+def _init_pool_nfa(nfa, symbols):
+    global _pool_nfa, _pool_symbols
+    _pool_nfa = nfa
+    _pool_symbols = symbols
+
+
+def _subset_step(chunk):
+    # Compute the closure of every symbol for a chunk of frontier subsets.
+    # Successors are deduplicated inside the chunk, so each distinct subset
+    # is pickled back once and the transitions refer to it by position.
+    successors = []
+    successor_index = {}
+    results = []
+    for state_id, subset in chunk:
+        edges = []
+        for symbol in _pool_symbols:
+            next_state = frozenset(
+                e_closure(_pool_nfa, move(_pool_nfa, subset, symbol))
+            )
+            if len(next_state) == 0:
+                continue
+            index = successor_index.get(next_state)
+            if index is None:
+                index = successor_index[next_state] = len(successors)
+                successors.append(next_state)
+            edges.append((symbol, index))
+        results.append((state_id, edges))
+    return results, successors
+
+
+def nfa_to_dfa_parallel(nfa, processes=None, chunksize=64):
+    from multiprocessing import Pool
+
+    start_state = frozenset(e_closure(nfa, [nfa.start_state]))
+    states = [start_state]
+    state_ids = {start_state: 0}  # Interned subsets, ids are assigned here only
+    symbols = sorted(nfa.alphabet)
+    accepting = set(nfa.accepting_states)
+    transitions = {}
+    accepting_states = []
+    frontier = [0]
+    with Pool(processes, initializer=_init_pool_nfa, initargs=(nfa, symbols)) as pool:
+        while frontier:
+            # The current BFS level is split in chunks, each subset of the
+            # frontier is sent to a worker exactly once
+            chunks = []
+            for i in range(0, len(frontier), chunksize):
+                chunk = frontier[i : i + chunksize]
+                chunks.append([(state_id, states[state_id]) for state_id in chunk])
+            next_frontier = []
+            for results, successors in pool.imap(_subset_step, chunks):
+                # Intern each distinct successor of the chunk once
+                successor_ids = []
+                for next_state in successors:
+                    next_id = state_ids.get(next_state)
+                    if next_id is None:
+                        next_id = len(states)
+                        state_ids[next_state] = next_id
+                        states.append(next_state)
+                        next_frontier.append(next_id)
+                    successor_ids.append(next_id)
+                for state_id, edges in results:
+                    current_state = states[state_id]
+                    for symbol, index in edges:
+                        transitions.setdefault(current_state, {})[symbol] = states[
+                            successor_ids[index]
+                        ]
+                    if accepting.intersection(current_state):
+                        accepting_states.append(current_state)
+            frontier = next_frontier
+    return DFA(states, nfa.alphabet, transitions, start_state, accepting_states)
+
+
 def simulate_nfa(nfa, s):
     current_states = e_closure(nfa, [nfa.start_state])
     for symbol in s:
@@ -226,6 +628,261 @@ def minimize(self):
     )
 
 
+def _automaton_view(automaton):
+    # Common view over DFA (this file) and AFD (REGEX-AFD.py): start state,
+    # alphabet, step function and accepting set. Missing transitions go to
+    # None, which acts as a rejecting sink.
+    if hasattr(automaton, "d"):
+        table = automaton.d
+
+        def step(state, symbol):
+            if state is None or state >= len(table):
+                return None
+            return table[state].get(symbol)
+
+        return automaton.q0, set(automaton.V), step, set(automaton.F)
+
+    transitions = automaton.transitions
+
+    def step(state, symbol):
+        if state is None:
+            return None
+        return transitions.get(state, {}).get(symbol)
+
+    return (
+        automaton.start_state,
+        set(automaton.alphabet),
+        step,
+        set(automaton.accepting_states),
+    )
+
+
+def check_equivalence(a, b):
+    # Hopcroft-Karp: merge the two start states and keep merging successors
+    # with union-find; a merged pair that disagrees on acceptance gives the
+    # counterexample. Returns (True, None) or (False, string).
+    start_a, alphabet_a, step_a, accept_a = _automaton_view(a)
+    start_b, alphabet_b, step_b, accept_b = _automaton_view(b)
+    alphabet = sorted(alphabet_a | alphabet_b)
+    parent = {}
+
+    def find(node):
+        root = node
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while node != root:
+            parent[node], node = root, parent.get(node, node)
+        return root
+
+    def accepts(node):
+        side, state = node
+        return state in (accept_a if side == 0 else accept_b)
+
+    start = ((0, start_a), (1, start_b))
+    parent[find(start[0])] = find(start[1])
+    queue = deque([(start, "")])
+    while queue:
+        (p, q), word = queue.popleft()
+        if accepts(p) != accepts(q):
+            return False, word
+        for symbol in alphabet:
+            next_p = (p[0], (step_a if p[0] == 0 else step_b)(p[1], symbol))
+            next_q = (q[0], (step_a if q[0] == 0 else step_b)(q[1], symbol))
+            root_p = find(next_p)
+            root_q = find(next_q)
+            if root_p != root_q:
+                parent[root_p] = root_q
+                queue.append(((next_p, next_q), word + symbol))
+    return True, None
+
+
+def check_inclusion(a, b):
+    # Product construction: L(a) is included in L(b) unless some reachable
+    # pair is accepting in a and not in b. Returns (True, None) or
+    # (False, string accepted by a and rejected by b).
+    start_a, alphabet_a, step_a, accept_a = _automaton_view(a)
+    start_b, alphabet_b, step_b, accept_b = _automaton_view(b)
+    alphabet = sorted(alphabet_a | alphabet_b)
+    start = (start_a, start_b)
+    visited = {start}
+    queue = deque([(start, "")])
+    while queue:
+        (p, q), word = queue.popleft()
+        if p in accept_a and q not in accept_b:
+            return False, word
+        for symbol in alphabet:
+            next_p = step_a(p, symbol)
+            if next_p is None:
+                # a rejects every extension from here
+                continue
+            pair = (next_p, step_b(q, symbol))
+            if pair not in visited:
+                visited.add(pair)
+                queue.append((pair, word + symbol))
+    return True, None
+
+
+def _matcher_table(automaton):
+    # Live states renumbered 0.. in BFS order from the start, with their
+    # transitions into live states. Live states are the ones that can still
+    # reach an accepting state, every other transition rejects right away.
+    start, alphabet, step, accepting = _automaton_view(automaton)
+    symbols = sorted(alphabet)
+    ids = {start: 0}
+    order = [start]
+    edges = []
+    i = 0
+    while i < len(order):
+        row = {}
+        for symbol in symbols:
+            next_state = step(order[i], symbol)
+            if next_state is None:
+                continue
+            if next_state not in ids:
+                ids[next_state] = len(order)
+                order.append(next_state)
+            row[symbol] = ids[next_state]
+        edges.append(row)
+        i += 1
+
+    predecessors = [[] for _ in order]
+    for state_id, row in enumerate(edges):
+        for j in row.values():
+            predecessors[j].append(state_id)
+    live = {ids[state] for state in order if state in accepting}
+    stack = list(live)
+    while stack:
+        for state_id in predecessors[stack.pop()]:
+            if state_id not in live:
+                live.add(state_id)
+                stack.append(state_id)
+
+    if 0 not in live:
+        return [], []
+    live_ids = {}
+    for state_id in range(len(order)):
+        if state_id in live:
+            live_ids[state_id] = len(live_ids)
+    rows = [
+        {symbol: live_ids[j] for symbol, j in edges[state_id].items() if j in live}
+        for state_id in live_ids
+    ]
+    accept_ids = [live_ids[ids[state]] for state in order if state in accepting]
+    return rows, sorted(accept_ids)
+
+
+# Self-loops taken one at a time before switching to the regex scan, short
+# runs are cheaper through the table than through a scan call
+_MATCHER_SCAN_AFTER = 4
+
+
+def generate_matcher_source(automaton, name="match", table=None):
+    # Python source of a table-driven matcher for one DFA/AFD. The code is not
+    # specialized per state: the generated function is a small interpreter
+    # over a tuple of per-state dicts indexed by integer state ids, one
+    # lookup per character whatever the number of states (an if-chain per
+    # state made every character O(states)). Compared with run_dfa it drops
+    # the frozenset hashing and the alphabet check. After a few consecutive
+    # self-loops the rest of the run is consumed by a single regex scan, and
+    # missing entries (including states that cannot reach acceptance) return
+    # False.
+    rows, accept_ids = table if table is not None else _matcher_table(automaton)
+    if not rows:
+        return "def %s(s):\n    return False\n" % name
+
+    scans = {}
+    for state_id, row in enumerate(rows):
+        # Input is read one character at a time, as in run_dfa, so only
+        # single-character symbols can loop; longer symbols never match
+        loop = [
+            symbol for symbol, j in row.items() if j == state_id and len(symbol) == 1
+        ]
+        if loop:
+            scans[state_id] = "[" + "".join(re.escape(c) for c in loop) + "]*"
+    lines = []
+    if scans:
+        lines += ["from itertools import islice", "import re", "", ""]
+    lines.append("ROWS = (")
+    for row in rows:
+        lines.append("    %r," % (row,))
+    lines += [")", "ACCEPT = frozenset(%r)" % (accept_ids,)]
+    if scans:
+        lines.append("SCANS = {")
+        for state_id, pattern in scans.items():
+            lines.append("    %d: re.compile(%r).match," % (state_id, pattern))
+        lines.append("}")
+    lines += ["", "", "def %s(s):" % name, "    rows = ROWS", "    state = 0"]
+    if scans:
+        lines += [
+            "    scans = SCANS",
+            "    n = len(s)",
+            "    run = 0",
+            "    chars = enumerate(s)",
+            "    for i, c in chars:",
+            "        next_state = rows[state].get(c)",
+            "        if next_state is None:",
+            "            return False",
+            "        if next_state != state:",
+            "            state = next_state",
+            "            run = 0",
+            "        elif run < %d:" % _MATCHER_SCAN_AFTER,
+            "            run += 1",
+            "        else:",
+            "            end = scans[state](s, i + 1).end()",
+            "            if end == n:",
+            "                break",
+            "            skip = end - i - 1",
+            "            next(islice(chars, skip, skip), None)",
+        ]
+    else:
+        lines += [
+            "    for c in s:",
+            "        state = rows[state].get(c)",
+            "        if state is None:",
+            "            return False",
+        ]
+    lines += ["    return state in ACCEPT", ""]
+    return "\n".join(lines)
+
+
+# Bumped whenever the generated source changes, invalidates the disk cache
+_MATCHER_FORMAT = 2
+
+# Matchers already loaded in this process, per automaton object
+_matcher_cache = weakref.WeakKeyDictionary()
+
+
+def compile_matcher(automaton, cache_dir=".matcher_cache"):
+    if automaton in _matcher_cache:
+        return _matcher_cache[automaton]
+    # The disk cache is keyed on the renumbered table, so a hit skips
+    # generating the source as well as compiling it
+    table = _matcher_table(automaton)
+    key = hashlib.sha256(repr((_MATCHER_FORMAT, table)).encode("utf-8")).hexdigest()
+    source_path = os.path.join(cache_dir, key + ".py")
+    # marshal data is only valid for the interpreter that wrote it
+    code_path = os.path.join(
+        cache_dir, "%s.%s.bin" % (key, sys.implementation.cache_tag)
+    )
+    try:
+        with open(code_path, "rb") as f:
+            code = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        source = generate_matcher_source(automaton, table=table)
+        code = compile(source, source_path, "exec")
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(source_path, "w", encoding="utf-8") as f:
+            f.write(source)
+        tmp_path = "%s.%d.tmp" % (code_path, os.getpid())
+        with open(tmp_path, "wb") as f:
+            marshal.dump(code, f)
+        os.replace(tmp_path, code_path)
+    namespace = {}
+    exec(code, namespace)
+    _matcher_cache[automaton] = namespace["match"]
+    return namespace["match"]
+
+
 # example usage:
 # nfa1 = NFA(
 #     states={"0", "1", "2", "3", "4", "5", "6", "7", "8", "9", "10"},
@@ -380,32 +1037,49 @@ nfa4 = NFA(
     accepting_states={"18"},
 )
 
+# nfa5 = load_nfa_txt("NFA.txt")
+
+if __name__ == "__main__":
+    dfa = nfa_to_dfa(nfa4)
+    mini = minimize(dfa)
+    draw_dfa1(dfa)
 
-dfa = nfa_to_dfa(nfa4)
-mini = minimize(dfa)
-draw_dfa1(dfa)
+    subsets_table = display_subsets(dfa)
+    print_table(subsets_table)
 
-subsets_table = display_subsets(dfa)
-print_table(subsets_table)
+    # draw_dfa(mini)
 
-# draw_dfa(mini)
+    # draw_dfa(dfa)
+    # print("DFA states: ", dfa.states)
+    # print("DFA transitions: ", dfa.transitions)
+    # print("DFA start state: ", dfa.start_state)
+    # print("DFA accepting states: ", dfa.accepting_states)
 
-# draw_dfa(dfa)
-# print("DFA states: ", dfa.states)
-# print("DFA transitions: ", dfa.transitions)
-# print("DFA start state: ", dfa.start_state)
-# print("DFA accepting states: ", dfa.accepting_states)
+    # Simulacion AFN
+    input_string = "abbbca"
+    result = simulate_nfa(nfa4, input_string)
+    print("\nSimulacion AFN")
+    print(
+        f"\nEl input {input_string} {'es' if result else 'no es '}aceptada por el AFN."
+    )
 
-# Simulacion AFN
-input_string = "abbbca"
-result = simulate_nfa(nfa4, input_string)
-print("\nSimulacion AFN")
-print(f"\nEl input {input_string} {'es' if result else 'no es '}aceptada por el AFN.")
+    # Simulacion AFD
+    input_string = "c"
+    is_accepted = run_dfa(dfa, input_string)
+    print("\nSimulacion AFD")
+    print(
+        f"\nEl input {input_string} {'es ' if is_accepted else 'no es '}aceptada por el AFD.\n"
+    )
 
-# Simulacion AFD
-input_string = "c"
-is_accepted = run_dfa(dfa, input_string)
-print("\nSimulacion AFD")
-print(
-    f"\nEl input {input_string} {'es ' if is_accepted else 'no es '}aceptada por el AFD.\n"
-)
+    # Matcher generado, tiene que coincidir con run_dfa (tambien con simbolos
+    # de mas de un caracter, que no forman parte de los bucles)
+    multi = DFA([0], {"a", "xy"}, {0: {"a": 0, "xy": 0}}, 0, [0])
+    print("\nMatcher generado")
+    for automaton, inputs in (
+        (mini, ["abbbca", "aab", "ab" * 10, "a" * 20 + "b", "b" * 50]),
+        (multi, ["", "aaaaaa", "aaaaaaxa", "xy"]),
+    ):
+        matcher = compile_matcher(automaton)
+        for input_string in inputs:
+            agrees = matcher(input_string) == run_dfa(automaton, input_string)
+            print(f"{input_string!r}: {'coincide' if agrees else 'NO coincide'}")
@@ -105,6 +105,92 @@ class RegexNode:
             self.item = "*"
             self.Hijos.append(RegexNode(self.recortar_corchetes(regex[:kleene])))
 
+    # Crea un nodo interno sin volver a parsear
+    @staticmethod
+    def nuevo(item, Hijos):
+        nodo = RegexNode.__new__(RegexNode)
+        nodo.nullable = None
+        nodo.firstpos = []
+        nodo.lastpos = []
+        nodo.item = item
+        nodo.position = None
+        nodo.Hijos = Hijos
+        return nodo
+
+    # Construye el or/concatenacion anidado a la derecha, como lo hace el parser
+    @staticmethod
+    def anidar(item, nodos):
+        nodo = nodos[-1]
+        for anterior in reversed(nodos[:-1]):
+            nodo = RegexNode.nuevo(item, [anterior, nodo])
+        return nodo
+
+    # Clave estructural para comparar subarboles
+    def clave(self):
+        return (self.item, tuple(Hijo.clave() for Hijo in self.Hijos))
+
+    def contar_hojas(self):
+        if not self.Hijos:
+            return 1
+        return sum(Hijo.contar_hojas() for Hijo in self.Hijos)
+
+    # Aplana una cadena de operadores iguales
+    def aplanar(self, item):
+        if self.item != item:
+            return [self]
+        return [n for Hijo in self.Hijos for n in Hijo.aplanar(item)]
+
+    def es_epsilon(self):
+        return usar_epsilon and self.item == epsilon
+
+    def simplificar(self):
+        # Hoja
+        if not self.Hijos:
+            return self
+        Hijos = [Hijo.simplificar() for Hijo in self.Hijos]
+        if self.item == ".":
+            return RegexNode.nuevo(".", Hijos)
+        if self.item == "|":
+            return RegexNode.unir(Hijos[0].aplanar("|") + Hijos[1].aplanar("|"))
+        # Kleene
+        Hijo = Hijos[0]
+        if Hijo.item == "*" or Hijo.es_epsilon():
+            # (a*)* = a*
+            return Hijo
+        if Hijo.item == "|":
+            # (a*|b|ϵ)* = (a|b)*
+            opciones = [
+                n.Hijos[0] if n.item == "*" else n
+                for n in Hijo.aplanar("|")
+                if not n.es_epsilon()
+            ]
+            if not opciones:
+                return Hijo.aplanar("|")[0]
+            Hijo = RegexNode.unir(opciones)
+        return RegexNode.nuevo("*", [Hijo])
+
+    # Construye un or sin alternativas repetidas y con prefijos comunes factorizados
+    @staticmethod
+    def unir(opciones):
+        unicas = {}
+        for n in opciones:
+            unicas.setdefault(n.clave(), n)
+        grupos = {}
+        for n in unicas.values():
+            secuencia = n.aplanar(".")
+            grupos.setdefault(secuencia[0].clave(), []).append(secuencia)
+        resultado = []
+        for secuencias in grupos.values():
+            if len(secuencias) > 1 and all(len(sec) > 1 for sec in secuencias):
+                # ab|ac = a(b|c)
+                resto = RegexNode.unir(
+                    [RegexNode.anidar(".", sec[1:]) for sec in secuencias]
+                )
+                resultado.append(RegexNode.nuevo(".", [secuencias[0][0], resto]))
+            else:
+                resultado.extend(RegexNode.anidar(".", sec) for sec in secuencias)
+        return RegexNode.anidar("|", resultado)
+
     def calc_functions(self, pos, followpos):
         # Es una hoja
         if self.es_letra(self.item):
@@ -191,8 +277,14 @@ class RegexNode:
 
 
 class RegexTree:
-    def __init__(self, regex):
+    def __init__(self, regex, simplificar=True):
         self.root = RegexNode(regex)
+        self.posiciones_eliminadas = 0
+        if simplificar:
+            # Reescribe el arbol antes de calcular followpos
+            hojas = self.root.contar_hojas()
+            self.root = self.root.simplificar()
+            self.posiciones_eliminadas = hojas - self.root.contar_hojas()
         self.followpos = []
         self.functions()
 
@@ -336,6 +428,150 @@ class AFD:
             print(i, self.d[i])
 
 
+class Derivadas:
+    # Cada nodo de la expresion es un entero, su forma canonica se guarda en
+    # self.formas con los hijos tambien como enteros:
+    # ("0",) vacio, ("e",) epsilon, ("s", a) simbolo, (".", r, s) concatenacion,
+    # ("|", frozenset) or, ("*", r) kleene
+    def __init__(self, raiz):
+        self.nodos = {}  # Tabla de hash-consing, forma canonica -> id
+        self.formas = []  # id -> forma canonica
+        self.nullables = []  # id -> nullable
+        self.cache = {}  # Memo de derivar, (id, simbolo) -> id
+        self.vacio = self.intern(("0",))
+        self.epsilon = self.intern(("e",))
+        self.raiz = self.desde_arbol(raiz)
+
+    def intern(self, forma):
+        # Cada forma canonica recibe un solo id, los hijos ya son ids asi que
+        # el hash de la forma no recorre el subarbol
+        nodo = self.nodos.get(forma)
+        if nodo is None:
+            nodo = len(self.formas)
+            self.nodos[forma] = nodo
+            self.formas.append(forma)
+            if forma[0] == "e" or forma[0] == "*":
+                self.nullables.append(True)
+            elif forma[0] == ".":
+                self.nullables.append(
+                    self.nullables[forma[1]] and self.nullables[forma[2]]
+                )
+            elif forma[0] == "|":
+                self.nullables.append(any(self.nullables[r] for r in forma[1]))
+            else:
+                self.nullables.append(False)
+        return nodo
+
+    # Constructores que simplifican a forma canonica
+    def simbolo(self, a):
+        return self.intern(("s", a))
+
+    def concat(self, r, s):
+        if r == self.vacio or s == self.vacio:
+            return self.vacio
+        if r == self.epsilon:
+            return s
+        if s == self.epsilon:
+            return r
+        forma = self.formas[r]
+        if forma[0] == ".":
+            # Se asocia a la derecha
+            return self.concat(forma[1], self.concat(forma[2], s))
+        return self.intern((".", r, s))
+
+    def union(self, *opciones):
+        miembros = set()
+        for r in opciones:
+            forma = self.formas[r]
+            if forma[0] == "|":
+                miembros |= forma[1]
+            elif r != self.vacio:
+                miembros.add(r)
+        if not miembros:
+            return self.vacio
+        if len(miembros) == 1:
+            return next(iter(miembros))
+        return self.intern(("|", frozenset(miembros)))
+
+    def kleene(self, r):
+        if r == self.vacio or r == self.epsilon:
+            return self.epsilon
+        if self.formas[r][0] == "*":
+            return r
+        return self.intern(("*", r))
+
+    def desde_arbol(self, nodo):
+        # Convierte un RegexNode al formato canonico, el marcador # es epsilon
+        if nodo.item == "|":
+            return self.union(*[self.desde_arbol(Hijo) for Hijo in nodo.Hijos])
+        if nodo.item == ".":
+            return self.concat(
+                self.desde_arbol(nodo.Hijos[0]), self.desde_arbol(nodo.Hijos[1])
+            )
+        if nodo.item == "*":
+            return self.kleene(self.desde_arbol(nodo.Hijos[0]))
+        if nodo.item == "#" or (usar_epsilon and nodo.item == epsilon):
+            return self.epsilon
+        return self.simbolo(nodo.item)
+
+    def nullable(self, r):
+        return self.nullables[r]
+
+    def derivar(self, r, a):
+        clave = (r, a)
+        if clave in self.cache:
+            return self.cache[clave]
+        forma = self.formas[r]
+        if forma[0] == "s":
+            resultado = self.epsilon if forma[1] == a else self.vacio
+        elif forma[0] == ".":
+            resultado = self.concat(self.derivar(forma[1], a), forma[2])
+            if self.nullables[forma[1]]:
+                resultado = self.union(resultado, self.derivar(forma[2], a))
+        elif forma[0] == "|":
+            resultado = self.union(*[self.derivar(s, a) for s in forma[1]])
+        elif forma[0] == "*":
+            resultado = self.concat(self.derivar(forma[1], a), r)
+        else:
+            resultado = self.vacio
+        self.cache[clave] = resultado
+        return resultado
+
+    def match(self, cadena):
+        # Simulacion perezosa, solo se derivan los estados que se visitan
+        r = self.raiz
+        for a in cadena:
+            r = self.derivar(r, a)
+            if r == self.vacio:
+                return False
+        return self.nullables[r]
+
+    def toAFD(self):
+        # Construccion completa, cada derivada distinta es un estado
+        V = alfabeto - {"#", epsilon if usar_epsilon else ""}
+        Q = [self.raiz]
+        indices = {self.raiz: 0}
+        d = []
+        F = []
+        i = 0
+        while i < len(Q):
+            q = Q[i]
+            d.append({})
+            if self.nullables[q]:
+                F.append(i)
+            for a in V:
+                U = self.derivar(q, a)
+                if U == self.vacio:
+                    # El estado vacio no se genera
+                    continue
+                if U not in indices:
+                    indices[U] = len(Q)
+                    Q.append(U)
+                d[i][a] = indices[U]
+            i += 1
+        return AFD(Q, V, d, 0, F)
+
+
 # Prepara la expresion para ser evaluada
 def pre_proceso(regex):
     regex = regex.replace(" ", "")
@@ -407,7 +643,7 @@ if is_valid_regex(regex):
     # Construccion de regex a afd
     tree = RegexTree(p_regex)
     tree.write()
-    AFD = tree.toAFD()
+    afd = tree.toAFD()
 
     # Se simula la cadena predeterminada
     evaluar_cadena = "babbaaaaa"
@@ -415,10 +651,21 @@ if is_valid_regex(regex):
     # prints finales para mostrar AFD resutante
     print("Regex: " + regex)
     print("Alfabeto : " + "".join(sorted(alfabeto)))
+    print("Posiciones eliminadas al simplificar: " + str(tree.posiciones_eliminadas))
     print("Automata AFD resultante: \n")
-    AFD.write()
+    afd.write()
     print('\nSimulacion en base a la cadena"' + evaluar_cadena + '" : \n')
-    AFD.run(evaluar_cadena)
+    afd.run(evaluar_cadena)
+
+    # Construccion y simulacion por derivadas sobre el mismo arbol
+    derivadas = Derivadas(tree.root)
+    afd_derivadas = derivadas.toAFD()
+    print("\nAutomata AFD por derivadas: \n")
+    afd_derivadas.write()
+    print(
+        "\nSimulacion por derivadas: "
+        + ("aceptada" if derivadas.match(evaluar_cadena) else "no aceptada")
+    )
     print("")
 else:
     print("Invalid regex")